@@ -4,25 +4,107 @@ Author: Neils Haldane-Lutterodt
 '''
 
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import messagebox, ttk
 from tkcalendar import DateEntry
 import json
 import os
+import sys
 from uuid import uuid4
-from datetime import datetime
-import shutil
+import time
 import logging
+import gc
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+
+try:
+    import orjson  # optional C-accelerated encoder/decoder
+except ImportError:
+    orjson = None
 
 # ---------------------------
 # FILE SETTINGS
 # ---------------------------
 TASKS_FILE = "tasks.json"
 BACKUP_FILE = "tasks_backup.json"
+JOURNAL_FILE = "tasks_journal.jsonl"
 SETTINGS_FILE = "settings.json"
 LOG_FILE = "task_ticker.log"
 
 logging.basicConfig(filename=LOG_FILE, level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# The journal is folded back into TASKS_FILE once it outgrows twice the
+# snapshot, but never before it reaches this many bytes
+JOURNAL_COMPACT_MIN_BYTES = 64 * 1024
+# Delay before buffered journal entries are written, so bursts share one write
+JOURNAL_FLUSH_DELAY_MS = 250
+
+# Compact JSON as UTF-8 bytes, and the matching decoder (both accept bytes).
+# Snapshots are indented so TASKS_FILE stays readable.
+if orjson is not None:
+    encode_json = orjson.dumps
+    decode_json = orjson.loads
+
+    def encode_snapshot(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+else:
+    def encode_json(obj):
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    decode_json = json.loads
+
+    def encode_snapshot(obj):
+        # Same layout as orjson's OPT_INDENT_2, so the file doesn't change
+        # format with the environment
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+@contextmanager
+def gc_paused():
+    # Bulk encode/decode allocates thousands of containers that can't form
+    # cycles; letting the cyclic GC scan them mid-way is wasted work
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+# Rows shown by the task listbox, and extra rows formatted above/below the view
+LIST_HEIGHT = 18
+LIST_OVERSCAN = 18
+# Listbox row: sequence, done mark, task, group, due date, blocked mark
+ROW_FORMAT = "[{}] {} {} [{}] (Due: {}){}".format
+
+# Most tasks offered at once by the dependency picker
+DEP_CHOICES_LIMIT = 100
+# Filtered views kept for switching back and forth between filters
+VIEW_CACHE_SIZE = 32
+# Lists shorter than this are formatted in full up front instead of on scroll
+LIST_EAGER_ROWS = 500
+
+# created_at has one-second resolution, so format it at most once per second
+_now_iso_cache = [None, ""]
+
+def now_iso():
+    now = int(time.time())
+    if _now_iso_cache[0] != now:
+        _now_iso_cache[0] = now
+        _now_iso_cache[1] = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now))
+    return _now_iso_cache[1]
+
+# Status filter choices mapped to the status value they select; "All" maps to nothing
+STATUS_FILTER = {"Pending": "pending", "Done": "done"}
+
+def dependency_label(task):
+    return f"{task['task']} [{task['group']}] (ID: {task['id'][:6]}...)"
+
+REQUIRED_TASK_KEYS = frozenset(("id", "task", "status"))
+
+def task_sort_key(key):
+    fallback = "9999-12-31" if key == "due_date" else 9999
+    return lambda t: t.get(key) or fallback
+
 DEFAULT_SETTINGS = {
     "auto_sort": False,
     "default_sort": "due_date"
@@ -36,31 +118,95 @@ class TaskTickerApp:
         self.root.resizable(False, False)
 
         self.tasks = []
+        # Indexes over the same task dicts as self.tasks; each maps UUID -> task
+        self.tasks_by_id = {}
+        self.tasks_by_group = {}  # group -> {id: task}
+        self.dependents = {}  # id -> set of ids of the tasks that depend on it
+        self.row_cache = {}  # id -> formatted listbox row
+        self.tasks_version = 0  # Bumped on every add/delete/status change
+        self.sorted_state = None  # (sort key, tasks_version) self.tasks is sorted for
+        # View key -> filtered, sorted task list; least recently used first.
+        # Only holds views of view_cache_version, the tasks_version it was filled at
+        self.view_cache = {}
+        self.view_cache_version = None
         self.visible_tasks = []
+        self.render_scheduled = False
+        self.rendered_version = None  # tasks_version the listbox rows show
+        self.rendered_key = None  # view_key of the rows the listbox shows
+        self.pending_ids = set()
+        self.pending_ids_version = None  # tasks_version pending_ids was built for
+        # rendered_rows[i] is 1 once row i of the listbox holds its real text
+        self.rendered_rows = bytearray()
+        self.lazy_rows = False  # True while some rows are still blank until scrolled to
         self.status_undo_stack = {}
 
+        # Mutations are appended here and compacted into TASKS_FILE later
+        self.journal = None  # Only touched on io_executor
+        self.journal_entries = 0
+        self.journal_bytes = 0
+        self.snapshot_bytes = 0
+        # Saves keep this current, so they never need to stat TASKS_FILE
+        self.tasks_file_exists = os.path.exists(TASKS_FILE)
+        self.snapshot_synced = True  # False while TASKS_FILE may sit unsynced in the page cache
+        self.snapshot_failed = False  # Set on io_executor when the journal could not be compacted
+        self.load_failed = False  # True if the files on disk could not be read; never overwrite them
+        # Task id -> its latest unwritten journal entry; repeat edits to a
+        # task before the next flush only write the last one
+        self.pending_journal = {}
+        self.journal_flush_scheduled = False
+        # Disk writes run here, one at a time and in order, off the Tk thread
+        self.io_executor = ThreadPoolExecutor(max_workers=1)
+
         self.filter_mode = tk.StringVar(value="All")
         self.group_filter = tk.StringVar(value="All Groups")
         self.group_entry_var = tk.StringVar(value="Personal")
 
-        self.sort_key = tk.StringVar(value="due_date")
         self.settings = self.load_settings()
-
-        self.dependency_map = {}  # Maps dropdown labels to UUIDs
-        self.selected_dependency = tk.StringVar(value="None")
+        self.sort_key = tk.StringVar(value=self.settings["default_sort"])
+
+        self.dependency_map = {}  # UUID -> dependency menu label
+        # Dropdown menus are rebuilt when opened, and only if tasks changed
+        self.group_menu_dirty = True
+        self.dep_menu_dirty = True
+        # What the built menus show below their first entry, in menu order
+        self.group_menu_labels = []
+        # Sorted (casefolded label, label, UUID) for every task the picker can offer
+        self.dep_menu_entries = []
+        self.dep_choices = {}  # Label -> UUID for the choices the picker shows now
+        self.selected_dependency = tk.StringVar(value="None")  # Label shown on the dropdown
+        self.selected_dependency_id = None
         self.sequence_input = tk.StringVar(value="1")
 
         self.create_widgets()
         self.load_tasks_from_file()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        # Don't leave edits buffered while the user is in another window
+        self.root.bind("<FocusOut>", self.on_focus_out)
+
+    def on_focus_out(self, event):
+        # Every child widget carries the root's bindtag; moving focus between
+        # them is not leaving the window
+        if event.widget is self.root:
+            self.flush_journal()
+
+    def on_close(self):
+        # A failed save must not leave a window that cannot be closed
+        try:
+            self.save_tasks_to_file(durable=True)
+        finally:
+            self.io_executor.shutdown(wait=True)
+            self.root.destroy()
 
     def load_settings(self):
+        # Read once at startup; everything else uses self.settings
+        settings = DEFAULT_SETTINGS.copy()
         if os.path.exists(SETTINGS_FILE):
             try:
                 with open(SETTINGS_FILE, 'r') as f:
-                    return json.load(f)
+                    settings.update(json.load(f))
             except Exception as e:
                 logging.error(f"Error loading settings: {e}")
-        return DEFAULT_SETTINGS.copy()
+        return settings
 
     def save_settings(self):
         with open(SETTINGS_FILE, 'w') as f:
@@ -71,20 +217,26 @@ class TaskTickerApp:
         control_frame.pack(pady=(10, 0))
 
         tk.Label(control_frame, text="Status:").grid(row=0, column=0, padx=5)
-        status_menu = tk.OptionMenu(control_frame, self.filter_mode, "All", "Pending", "Done", command=lambda _: self.render_task_list())
+        status_menu = tk.OptionMenu(control_frame, self.filter_mode, "All", "Pending", "Done")
         status_menu.grid(row=0, column=1)
 
         tk.Label(control_frame, text="Group:").grid(row=0, column=2, padx=5)
-        self.group_dropdown = tk.OptionMenu(control_frame, self.group_filter, "All Groups", command=lambda _: self.render_task_list())
+        self.group_dropdown = tk.OptionMenu(control_frame, self.group_filter, "All Groups")
         self.group_dropdown.grid(row=0, column=3)
+        self.group_dropdown.bind("<Button-1>", self.refresh_group_menu)
 
         tk.Label(control_frame, text="Sort by:").grid(row=1, column=0, padx=5)
-        sort_menu = tk.OptionMenu(control_frame, self.sort_key, "due_date", "created_at", "priority", "sequence", command=lambda _: self.sort_and_render())
+        sort_menu = tk.OptionMenu(control_frame, self.sort_key, "due_date", "created_at", "priority", "sequence")
         sort_menu.grid(row=1, column=1)
 
         sort_btn = tk.Button(control_frame, text="Sort Now", command=self.sort_and_render)
         sort_btn.grid(row=1, column=2, columnspan=2, pady=5)
 
+        # Any change to a filter or the sort key, from a menu or from code,
+        # queues one redraw; changes made in the same event share it
+        for var in (self.filter_mode, self.group_filter, self.sort_key):
+            var.trace_add("write", lambda *_: self.schedule_render())
+
         entry_frame = tk.Frame(self.root)
         entry_frame.pack(pady=10)
 
@@ -107,20 +259,23 @@ class TaskTickerApp:
         dep_frame.pack()
 
         tk.Label(dep_frame, text="Depends On:").pack(side=tk.LEFT)
-        self.dep_dropdown = tk.OptionMenu(dep_frame, self.selected_dependency, "None")
+        # Type to search; the list shows at most DEP_CHOICES_LIMIT matches
+        self.dep_dropdown = ttk.Combobox(dep_frame, textvariable=self.selected_dependency, width=40, postcommand=self.refresh_dependency_menu)
         self.dep_dropdown.pack(side=tk.LEFT)
+        self.dep_dropdown.bind("<KeyRelease>", self.on_dependency_typed)
+        self.dep_dropdown.bind("<<ComboboxSelected>>", self.on_dependency_selected)
 
         list_frame = tk.Frame(self.root)
         list_frame.pack(pady=10)
 
-        self.task_listbox = tk.Listbox(list_frame, height=18, width=80)
+        self.task_listbox = tk.Listbox(list_frame, height=LIST_HEIGHT, width=80)
         self.task_listbox.pack(side=tk.LEFT)
 
-        scrollbar = tk.Scrollbar(list_frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.scrollbar = tk.Scrollbar(list_frame)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
-        self.task_listbox.config(yscrollcommand=scrollbar.set)
-        scrollbar.config(command=self.task_listbox.yview)
+        self.task_listbox.config(yscrollcommand=self.on_list_scroll)
+        self.scrollbar.config(command=self.task_listbox.yview)
 
         btn_frame = tk.Frame(self.root)
         btn_frame.pack(pady=10)
@@ -133,8 +288,7 @@ class TaskTickerApp:
         group = self.group_input.get().strip() or "General"
         due_date = self.due_input.get_date().isoformat()
         sequence = int(self.sequence_input.get() or 1)
-        dep_label = self.selected_dependency.get()
-        depends_on = self.dependency_map.get(dep_label) if dep_label != "None" else None
+        depends_on = self.selected_dependency_id
 
         if not text:
             messagebox.showwarning("Empty Input", "Please enter a task.")
@@ -153,124 +307,659 @@ class TaskTickerApp:
             "id": str(uuid4()),
             "task": text,
             "status": "pending",
-            "group": group.title(),
+            "group": sys.intern(group.title()),
             "due_date": due_date,
-            "created_at": datetime.now().isoformat(),
+            "created_at": now_iso(),
             "priority": "normal",
             "sequence": sequence,
             "depends_on": depends_on
         }
 
-        self.tasks.append(task)
+        # Keep an already sorted list sorted rather than re-sorting it
+        order = self.current_sort_order()
+        if order:
+            bisect.insort(self.tasks, task, key=task_sort_key(order))
+        else:
+            self.tasks.append(task)
+        self.index_task(task)
+        self.bump_tasks_version()
         self.task_input.delete(0, tk.END)
         self.group_entry_var.set(group.title())
         self.sequence_input.set(str(sequence + 1))
-        self.selected_dependency.set("None")
-        self.save_tasks_to_file()
-        self.update_group_filter_options()
-        self.update_dependency_dropdown()
-        self.sort_and_render()
+        self.select_dependency(None)
+        self.append_journal(task["id"], {"op": "put", "task": task})
+        self.add_to_menus(task)
+        if self.can_patch_rows():
+            self.insert_task_row(task)
+        else:
+            self.schedule_render()
         logging.info(f"Task added: {task}")
 
     def delete_task(self):
-        try:
-            idx = self.task_listbox.curselection()[0]
-            task = self.visible_tasks[idx]
-            self.tasks = [t for t in self.tasks if t["id"] != task["id"]]
-            self.save_tasks_to_file()
-            self.update_group_filter_options()
-            self.update_dependency_dropdown()
-            self.sort_and_render()
-        except IndexError:
+        selection = self.task_listbox.curselection()
+        if not selection:
             messagebox.showerror("No Selection", "Please select a task to delete.")
+            return
+        task = self.visible_tasks[selection[0]]
+        if task["id"] not in self.tasks_by_id:
+            return  # Already deleted; the list just has not been redrawn yet
+        del self.tasks[self.task_index(task)]
+        self.invalidate_rows(task["id"])
+        self.unindex_task(task)
+        self.bump_tasks_version()
+        self.append_journal(task["id"], {"op": "del", "id": task["id"]})
+        self.remove_from_menus(task)
+        if self.can_patch_rows():
+            self.remove_task_row(selection[0], task)
+        else:
+            self.schedule_render()
+
+    def task_index(self, task):
+        tasks = self.tasks
+        i = 0
+        order = self.current_sort_order()
+        if order:
+            # Sorted: bisect to the first task with the same key, then step
+            # over its equal-keyed neighbours
+            key = task_sort_key(order)
+            i = bisect.bisect_left(tasks, key(task), key=key)
+        while tasks[i] is not task:
+            i += 1
+        return i
 
     def toggle_task_status(self):
-        try:
-            idx = self.task_listbox.curselection()[0]
-            task = self.visible_tasks[idx]
-            if task.get("depends_on"):
-                dep = self.find_task_by_id(task["depends_on"])
-                if dep and dep["status"] != "done":
-                    messagebox.showwarning("Dependency Unmet", f"This task depends on '{dep['task']}' which is not yet done.")
-                    return
-            for t in self.tasks:
-                if t["id"] == task["id"]:
-                    t["status"] = "pending" if t["status"] == "done" else "done"
-                    break
-            self.save_tasks_to_file()
-            self.sort_and_render()
-        except IndexError:
+        selection = self.task_listbox.curselection()
+        if not selection:
             messagebox.showerror("No Selection", "Please select a task to toggle.")
+            return
+        # visible_tasks holds the same dicts as self.tasks, so no id scan is needed
+        task = self.visible_tasks[selection[0]]
+        if task["id"] not in self.tasks_by_id:
+            return  # Deleted; the list just has not been redrawn yet
+        if task.get("depends_on"):
+            dep = self.find_task_by_id(task["depends_on"])
+            if dep and dep["status"] != "done":
+                messagebox.showwarning("Dependency Unmet", f"This task depends on '{dep['task']}' which is not yet done.")
+                return
+        task["status"] = "pending" if task["status"] == "done" else "done"
+        self.invalidate_rows(task["id"])
+        self.bump_tasks_version()
+        self.append_journal(task["id"], {"op": "put", "task": task})
+        if self.can_patch_rows():
+            self.update_task_row(selection[0], task)
+        else:
+            self.schedule_render()
+
+    def schedule_render(self):
+        # Redraw once the event queue drains, so a burst of changes draws once
+        if not self.render_scheduled:
+            self.render_scheduled = True
+            self.root.after_idle(self.run_scheduled_render)
+
+    def run_scheduled_render(self):
+        self.render_scheduled = False
+        self.sort_and_render()
 
     def sort_and_render(self):
         key = self.sort_key.get()
-        self.tasks.sort(key=lambda t: t.get(key) or ("9999-12-31" if key == "due_date" else 9999))
+        if self.current_sort_order() != key:
+            self.tasks.sort(key=task_sort_key(key))
+            self.sorted_state = (key, self.tasks_version)
         self.render_task_list()
 
-    def get_filtered_tasks(self):
-        status = self.filter_mode.get()
+    def current_sort_order(self):
+        # The sort key self.tasks is ordered by, or None if it may be out of order
+        if self.sorted_state and self.sorted_state[1] == self.tasks_version:
+            return self.sorted_state[0]
+        return None
+
+    def bump_tasks_version(self, order_kept=True):
+        order = self.current_sort_order()
+        self.tasks_version += 1
+        if order_kept and order:
+            self.sorted_state = (order, self.tasks_version)
+
+    def index_task(self, task):
+        task_id = task["id"]
+        self.tasks_by_id[task_id] = task
+        self.tasks_by_group.setdefault(task["group"], {})[task_id] = task
+        if task.get("depends_on"):
+            self.dependents.setdefault(task["depends_on"], set()).add(task_id)
+
+    def unindex_task(self, task):
+        task_id = task["id"]
+        del self.tasks_by_id[task_id]
+        group_tasks = self.tasks_by_group[task["group"]]
+        del group_tasks[task_id]
+        if not group_tasks:
+            del self.tasks_by_group[task["group"]]
+        if task.get("depends_on"):
+            siblings = self.dependents[task["depends_on"]]
+            siblings.discard(task_id)
+            if not siblings:
+                del self.dependents[task["depends_on"]]
+
+    def rebuild_indexes(self):
+        self.tasks_by_id = {}
+        self.tasks_by_group = {}
+        self.dependents = {}
+        self.row_cache = {}
+        for t in self.tasks:
+            self.index_task(t)
+
+    def lookup_view(self, cache_key):
+        view = self.view_cache.pop(cache_key, None)
+        if view is None:
+            status, group = cache_key[:2]
+            view = self.filter_tasks(status, group)
+        self.cache_view(cache_key, view)
+        return view
+
+    def cache_view(self, cache_key, view):
+        # Views of older versions can never be asked for again
+        if self.view_cache_version != self.tasks_version:
+            self.view_cache.clear()
+            self.view_cache_version = self.tasks_version
+        elif len(self.view_cache) >= VIEW_CACHE_SIZE:
+            del self.view_cache[next(iter(self.view_cache))]
+        self.view_cache[cache_key] = view
+
+    def view_key(self, status, group):
+        return (status, group, self.sort_key.get(), self.sorted_state, self.tasks_version)
+
+    def task_matches_filter(self, task):
+        want = STATUS_FILTER.get(self.filter_mode.get())
         group = self.group_filter.get()
-        filtered = self.tasks
-        if status != "All":
-            filtered = [t for t in filtered if t["status"] == status.lower()]
-        if group != "All Groups":
-            filtered = [t for t in filtered if t["group"] == group]
-        return filtered
+        return (want is None or task["status"] == want) and (group == "All Groups" or task["group"] == group)
+
+    def filter_tasks(self, status, group):
+        want = STATUS_FILTER.get(status)
+        # Status and group values are interned, so each test below is usually
+        # an identity check; one comprehension per filter keeps the loop tight
+        group = sys.intern(group)
+        tasks = self.tasks
+        if want is None:
+            if group == "All Groups":
+                # A copy: self.tasks changes in place before the next redraw
+                view = tasks[:]
+            else:
+                view = [t for t in tasks if t["group"] == group]
+        elif group == "All Groups":
+            view = [t for t in tasks if t["status"] == want]
+        else:
+            view = [t for t in tasks if t["status"] == want and t["group"] == group]
+        # Redraws sort self.tasks first; otherwise sort the view, which is
+        # stable, so tasks with equal keys keep their list order either way
+        key = self.sort_key.get()
+        if self.current_sort_order() != key:
+            view.sort(key=task_sort_key(key))
+        return view
 
     def render_task_list(self):
-        self.task_listbox.delete(0, tk.END)
-        self.visible_tasks = self.get_filtered_tasks()
-        for t in self.visible_tasks:
-            blocked = " ⛔" if t.get("depends_on") and self.find_task_by_id(t["depends_on"])["status"] != "done" else ""
-            seq = f"[{t.get('sequence', '?')}]"
-            line = f"{seq} {'✔' if t['status']=='done' else ''} {t['task']} [{t['group']}] (Due: {t['due_date']}){blocked}"
-            self.task_listbox.insert(tk.END, line)
+        # Re-selecting the same filter or sort, or a redraw queued behind a
+        # row patch, would rebuild identical rows
+        key = self.view_key(self.filter_mode.get(), self.group_filter.get())
+        if key == self.rendered_key:
+            return
+        self.rendered_key = key
+        # Rows move when tasks are added or re-sorted, so remember the
+        # selection by task id rather than by row number
+        old_visible = self.visible_tasks
+        selected_ids = {old_visible[i]["id"] for i in self.task_listbox.curselection() if i < len(old_visible)}
+        # Reuse the key: each variable read is a round trip into Tcl
+        self.visible_tasks = self.lookup_view(key)
+        self.rendered_version = self.tasks_version
+        # One pass over all tasks instead of a parent lookup per row, and only
+        # when tasks changed; filter and scroll redraws reuse it
+        if self.pending_ids_version != self.tasks_version:
+            self.pending_ids = {t["id"] for t in self.tasks if t["status"] != "done"}
+            self.pending_ids_version = self.tasks_version
+        count = len(self.visible_tasks)
+        if count < LIST_EAGER_ROWS:
+            # Short lists: format every row and fill the listbox in one call
+            fmt = self.format_task_row
+            self.rendered_rows = bytearray(b"\x01") * count
+            self.lazy_rows = False
+            self.task_listbox.delete(0, tk.END)
+            self.task_listbox.insert(0, *[fmt(t) for t in self.visible_tasks])
+        else:
+            # Long lists: fill the listbox with blank rows in one call; only the
+            # rows in view get formatted now, the rest as they are scrolled to
+            self.rendered_rows = bytearray(count)
+            self.lazy_rows = True
+            self.task_listbox.delete(0, tk.END)
+            self.task_listbox.insert(0, *[""] * count)
+            first, last = self.task_listbox.yview()
+            self.render_visible_rows(first, last)
+        if selected_ids:
+            self.restore_selection(selected_ids)
+
+    def restore_selection(self, selected_ids):
+        listbox = self.task_listbox
+        listbox.selection_clear(0, tk.END)
+        remaining = len(selected_ids)
+        for i, t in enumerate(self.visible_tasks):
+            if t["id"] in selected_ids:
+                listbox.selection_set(i)
+                remaining -= 1
+                if not remaining:
+                    break
+
+    def can_patch_rows(self):
+        # A single change can be applied to the rows in place only if they
+        # show the state just before it and no full redraw is already queued
+        return (not self.render_scheduled
+                and self.rendered_version == self.tasks_version - 1
+                and self.current_sort_order() == self.sort_key.get())
+
+    def insert_task_row(self, task):
+        self.pending_ids.add(task["id"])
+        if self.task_matches_filter(task):
+            sort_key = task_sort_key(self.sort_key.get())
+            i = bisect.bisect_right(self.visible_tasks, sort_key(task), key=sort_key)
+            self.visible_tasks.insert(i, task)
+            self.rendered_rows.insert(i, 1)
+            self.task_listbox.insert(i, self.format_task_row(task))
+        self.finish_row_patch()
+
+    def remove_task_row(self, i, task):
+        was_pending = task["id"] in self.pending_ids
+        self.pending_ids.discard(task["id"])
+        del self.visible_tasks[i]
+        del self.rendered_rows[i]
+        self.task_listbox.delete(i)
+        if was_pending:
+            self.refresh_dependent_rows(task["id"])
+        self.finish_row_patch()
+
+    def update_task_row(self, i, task):
+        # Toggling never changes a task's sort position, only whether it
+        # still passes the status filter
+        if task["status"] == "done":
+            self.pending_ids.discard(task["id"])
+        else:
+            self.pending_ids.add(task["id"])
+        if self.task_matches_filter(task):
+            self.refresh_row(i)
+        else:
+            del self.visible_tasks[i]
+            del self.rendered_rows[i]
+            self.task_listbox.delete(i)
+        self.refresh_dependent_rows(task["id"])
+        self.finish_row_patch()
+
+    def refresh_dependent_rows(self, task_id):
+        # Rows whose blocked marker depends on task_id; rows not formatted
+        # yet pick up the new state when they are scrolled to
+        children = self.dependents.get(task_id)
+        if not children:
+            return
+        rendered = self.rendered_rows
+        for i, t in enumerate(self.visible_tasks):
+            if rendered[i] and t["id"] in children:
+                self.refresh_row(i)
+
+    def refresh_row(self, i):
+        self.rendered_rows[i] = 1
+        self.replace_rows(i, [self.format_task_row(self.visible_tasks[i])])
+
+    def replace_rows(self, start, rows):
+        # Deleting rows drops their selection and moves the active row; restore both
+        listbox = self.task_listbox
+        end = start + len(rows) - 1
+        selected = [i for i in listbox.curselection() if start <= i <= end]
+        active = listbox.index(tk.ACTIVE)
+        listbox.delete(start, end)
+        listbox.insert(start, *rows)
+        for i in selected:
+            listbox.selection_set(i)
+        if start <= active <= end:
+            listbox.activate(active)
+
+    def finish_row_patch(self):
+        # The patched rows now match tasks_version; record that so later
+        # redraws reuse them
+        self.rendered_version = self.tasks_version
+        self.pending_ids_version = self.tasks_version
+        self.rendered_key = self.view_key(self.filter_mode.get(), self.group_filter.get())
+        self.cache_view(self.rendered_key, self.visible_tasks)
+
+    def invalidate_rows(self, task_id):
+        # A task's row shows its own fields plus whether its parent is pending
+        self.row_cache.pop(task_id, None)
+        for child_id in self.dependents.get(task_id, ()):
+            self.row_cache.pop(child_id, None)
+
+    def format_task_row(self, t):
+        row = self.row_cache.get(t["id"])
+        if row is None:
+            row = self.row_cache[t["id"]] = self.build_task_row(t)
+        return row
+
+    def build_task_row(self, t):
+        return ROW_FORMAT(
+            t.get("sequence", "?"),
+            "✔" if t["status"] == "done" else "",
+            t["task"], t["group"], t["due_date"],
+            " ⛔" if t.get("depends_on") in self.pending_ids else ""
+        )
+
+    def on_list_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        # The listbox calls this after every rebuild as well as on scrolling;
+        # when every row was formatted up front only the scrollbar needs it
+        if self.lazy_rows:
+            self.render_visible_rows(float(first), float(last))
+
+    def render_visible_rows(self, first, last):
+        count = len(self.visible_tasks)
+        start = int(first * count)
+        # Before the listbox is mapped yview() reports an empty range
+        end = max(int(last * count) + 1, start + LIST_HEIGHT)
+        start = max(start - LIST_OVERSCAN, 0)
+        end = min(end + LIST_OVERSCAN, count)
+        # Bound once; this loop runs for every row scrolled into view
+        rendered = self.rendered_rows
+        visible = self.visible_tasks
+        fmt = self.format_task_row
+        # Fill each run of blank rows with one replace_rows call
+        i = start
+        while i < end:
+            if rendered[i]:
+                i += 1
+                continue
+            run_start = i
+            while i < end and not rendered[i]:
+                rendered[i] = 1
+                i += 1
+            self.replace_rows(run_start, [fmt(t) for t in visible[run_start:i]])
+
+    def mark_menus_dirty(self):
+        self.group_menu_dirty = True
+        self.dep_menu_dirty = True
+
+    def refresh_group_menu(self, event=None):
+        if self.group_menu_dirty:
+            self.update_group_filter_options()
+
+    def refresh_dependency_menu(self):
+        if self.dep_menu_dirty:
+            self.update_dependency_dropdown()
+        text = self.selected_dependency.get()
+        if text in ("None", self.dependency_map.get(self.selected_dependency_id)):
+            prefix = ""  # Showing the current choice; offer everything
+        else:
+            prefix = text.casefold()
+        # Entries are sorted by casefolded label, so prefix matches are adjacent
+        entries = self.dep_menu_entries
+        choices = {}
+        for i in range(bisect.bisect_left(entries, (prefix,)), len(entries)):
+            key, label, task_id = entries[i]
+            if not key.startswith(prefix) or len(choices) == DEP_CHOICES_LIMIT:
+                break
+            choices[label] = task_id
+        self.dep_choices = choices
+        self.dep_dropdown["values"] = ("None", *choices)
+
+    def on_dependency_typed(self, event):
+        # Typing replaces the previous choice; text matching no listed task means none
+        self.selected_dependency_id = None
+        self.refresh_dependency_menu()
+        self.selected_dependency_id = self.dep_choices.get(self.selected_dependency.get())
+
+    def on_dependency_selected(self, event):
+        self.select_dependency(self.dep_choices.get(self.selected_dependency.get()))
+
+    def add_to_menus(self, task):
+        # Patch menus that are already built; dirty ones are rebuilt on open anyway
+        group = task["group"]
+        if not self.group_menu_dirty and len(self.tasks_by_group[group]) == 1:
+            i = bisect.bisect_left(self.group_menu_labels, group)
+            self.group_menu_labels.insert(i, group)
+            self.group_dropdown["menu"].insert_command(i + 1, label=group, command=partial(self.set_group_filter, group))
+        if not self.dep_menu_dirty:
+            label = self.dependency_map[task["id"]] = dependency_label(task)
+            bisect.insort(self.dep_menu_entries, (label.casefold(), label, task["id"]))
+
+    def remove_from_menus(self, task):
+        group = task["group"]
+        if not self.group_menu_dirty and group not in self.tasks_by_group:
+            i = bisect.bisect_left(self.group_menu_labels, group)
+            del self.group_menu_labels[i]
+            self.group_dropdown["menu"].delete(i + 1)
+        if task["id"] == self.selected_dependency_id:
+            self.select_dependency(None)
+        if not self.dep_menu_dirty:
+            label = self.dependency_map.pop(task["id"])
+            entries = self.dep_menu_entries
+            del entries[bisect.bisect_left(entries, (label.casefold(), label, task["id"]))]
 
     def update_group_filter_options(self):
-        groups = sorted({t["group"] for t in self.tasks})
+        self.group_menu_dirty = False
+        groups = self.group_menu_labels = sorted(self.tasks_by_group)
         menu = self.group_dropdown["menu"]
         menu.delete(0, "end")
-        menu.add_command(label="All Groups", command=lambda: self.set_group_filter("All Groups"))
+        menu.add_command(label="All Groups", command=partial(self.set_group_filter, "All Groups"))
         for g in groups:
-            menu.add_command(label=g, command=lambda val=g: self.set_group_filter(val))
+            menu.add_command(label=g, command=partial(self.set_group_filter, g))
 
     def set_group_filter(self, val):
         self.group_filter.set(val)
-        self.render_task_list()
 
     def update_dependency_dropdown(self):
+        self.dep_menu_dirty = False
         self.dependency_map.clear()
-        menu = self.dep_dropdown["menu"]
-        menu.delete(0, "end")
-        menu.add_command(label="None", command=lambda: self.selected_dependency.set("None"))
-        for task in self.tasks:
-            label = f"{task['task']} [{task['group']}] (ID: {task['id'][:6]}...)"
-            self.dependency_map[label] = task["id"]
-            menu.add_command(label=label, command=lambda val=label: self.selected_dependency.set(val))
+        for task_id, task in self.tasks_by_id.items():
+            self.dependency_map[task_id] = dependency_label(task)
+        # Sorted, so later adds and deletes can bisect to their entry
+        self.dep_menu_entries = sorted((label.casefold(), label, task_id) for task_id, label in self.dependency_map.items())
+
+    def select_dependency(self, task_id):
+        self.selected_dependency_id = task_id
+        self.selected_dependency.set("None" if task_id is None else dependency_label(self.tasks_by_id[task_id]))
 
     def find_task_by_id(self, task_id):
-        for task in self.tasks:
-            if task["id"] == task_id:
-                return task
-        return None
+        return self.tasks_by_id.get(task_id)
 
-    def save_tasks_to_file(self):
-        if os.path.exists(TASKS_FILE):
-            shutil.copy(TASKS_FILE, BACKUP_FILE)
-        with open(TASKS_FILE, 'w') as f:
-            json.dump(self.tasks, f, indent=4)
+    def append_journal(self, task_id, entry):
+        self.pending_journal[task_id] = entry
+        if not self.journal_flush_scheduled:
+            self.journal_flush_scheduled = True
+            self.root.after(JOURNAL_FLUSH_DELAY_MS, self.flush_journal)
 
-    def load_tasks_from_file(self):
-        if os.path.exists(TASKS_FILE):
+    def flush_journal(self):
+        self.journal_flush_scheduled = False
+        if not self.pending_journal:
+            return
+        self.write_pending_journal()
+        # Replaying a journal larger than the snapshot costs more than rewriting it
+        if self.journal_bytes > max(2 * self.snapshot_bytes, JOURNAL_COMPACT_MIN_BYTES):
+            self.save_tasks_to_file()
+
+    def write_pending_journal(self):
+        if not self.pending_journal:
+            return
+        data = b"".join(encode_json(e) + b"\n" for e in self.pending_journal.values())
+        self.journal_entries += len(self.pending_journal)
+        self.journal_bytes += len(data)
+        self.pending_journal.clear()
+        self.io_executor.submit(self.write_journal, data)
+
+    def write_journal(self, data):
+        # Runs on io_executor
+        try:
+            if self.journal is None:
+                self.journal = open(JOURNAL_FILE, 'ab')
+            self.journal.write(data)
+            self.journal.flush()
+        except OSError as e:
+            logging.error(f"Journal Write Error: {e}")
+
+    def save_tasks_to_file(self, durable=False):
+        # Writes a full snapshot, which also makes the journal redundant.
+        # Nothing journaled since the last snapshot means nothing to write.
+        # Only durable saves (on close) wait for the data to reach the disk.
+        # Journal anything still buffered first, so a failed snapshot loses nothing.
+        self.write_pending_journal()
+        if self.load_failed:
+            # A snapshot would replace the files that failed to load with just
+            # this session's tasks; keep changes in the journal only
+            if durable:
+                self.io_executor.submit(self.sync_journal).result()
+            return
+        if self.journal_entries == 0 and not self.snapshot_failed:
+            if durable:
+                self.io_executor.submit(self.sync_snapshot).result()
+            return
+        # Copy the task dicts so edits made while the write runs stay out of it
+        tasks = [dict(t) for t in self.tasks]
+        self.journal_entries = 0
+        self.journal_bytes = 0
+        future = self.io_executor.submit(self.write_snapshot, tasks, durable)
+        if durable:
+            future.result()
+
+    def write_snapshot(self, tasks, durable):
+        # Runs on io_executor, after any journal writes submitted before it
+        try:
+            # json.dump would issue a write() per token; encode once instead.
+            # No gc_paused() here: it would switch off the collector for the
+            # Tk thread too.
+            data = encode_snapshot(tasks)
+            # Write beside the real file, then rename: the old snapshot becomes
+            # the backup without copying it, and a crash never leaves a torn file
+            tmp_file = TASKS_FILE + ".tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+                f.flush()
+                if durable:
+                    os.fsync(f.fileno())
+                self.snapshot_bytes = f.tell()
+            if self.tasks_file_exists:
+                try:
+                    os.replace(TASKS_FILE, BACKUP_FILE)
+                except FileNotFoundError:
+                    logging.warning(f"{TASKS_FILE} was removed outside the app; no backup made")
+            os.replace(tmp_file, TASKS_FILE)
+            self.tasks_file_exists = True
+            self.snapshot_synced = durable
+            self.snapshot_failed = False
+            self.reset_journal()
+        except OSError as e:
+            logging.error(f"Save Error: {e}")
+            # The journal still holds every change; keep it and retry on the next save
+            self.snapshot_failed = True
+            if durable:
+                self.sync_journal()
+
+    def sync_journal(self):
+        # Runs on io_executor
+        if self.journal is not None:
             try:
-                with open(TASKS_FILE, 'r') as f:
-                    self.tasks = json.load(f)
-                self.update_group_filter_options()
-                self.update_dependency_dropdown()
-                self.sort_and_render()
-            except Exception as e:
-                messagebox.showwarning("Load Error", str(e))
-                self.tasks = []
+                os.fsync(self.journal.fileno())
+            except OSError as e:
+                logging.error(f"Journal Sync Error: {e}")
+
+    def sync_snapshot(self):
+        # Runs on io_executor
+        if not self.snapshot_synced:
+            try:
+                # Windows only flushes a file opened for writing
+                with open(TASKS_FILE, 'r+b') as f:
+                    os.fsync(f.fileno())
+                self.snapshot_synced = True
+            except OSError as e:
+                logging.error(f"Sync Error: {e}")
+
+    def reset_journal(self):
+        # Runs on io_executor
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        if os.path.exists(JOURNAL_FILE):
+            os.remove(JOURNAL_FILE)
+
+    def replay_journal(self):
+        tasks_by_id = {t["id"]: t for t in self.tasks}
+        size = 0
+        line = b""
+        with open(JOURNAL_FILE, 'rb') as f:
+            for line_no, line in enumerate(f, 1):
+                line_start = size
+                size += len(line)
+                try:
+                    entry = decode_json(line)
+                except ValueError:
+                    # A crash mid-append can leave a torn final line
+                    logging.warning(f"Skipping unreadable journal line {line_no}")
+                    line_readable = False
+                    continue
+                line_readable = True
+                if entry["op"] == "put":
+                    tasks_by_id[entry["task"]["id"]] = entry["task"]
+                elif entry["op"] == "del":
+                    tasks_by_id.pop(entry["id"], None)
+                self.journal_entries += 1
+        if line and not line.endswith(b"\n"):
+            # Appends would run on into the unterminated last line and make
+            # the next entry unreadable too: drop it if it is torn, else end it
+            try:
+                with open(JOURNAL_FILE, 'r+b') as f:
+                    if line_readable:
+                        f.seek(0, os.SEEK_END)
+                        f.write(b"\n")
+                        size += 1
+                    else:
+                        f.truncate(line_start)
+                        size = line_start
+            except OSError as e:
+                logging.error(f"Journal Repair Error: {e}")
+        self.journal_bytes += size
+        self.tasks = list(tasks_by_id.values())
+
+    def load_tasks_from_file(self):
+        if not (self.tasks_file_exists or os.path.exists(JOURNAL_FILE)):
+            return
+        try:
+            with gc_paused():
+                if self.tasks_file_exists:
+                    with open(TASKS_FILE, 'rb') as f:
+                        raw = f.read()
+                    self.snapshot_bytes = len(raw)
+                    data = decode_json(raw)
+                    self.validate_json_data(data)
+                    self.tasks = data
+                if os.path.exists(JOURNAL_FILE):
+                    self.replay_journal()
+                    self.validate_json_data(self.tasks)
+            # The decoder does not intern values; interned strings let the
+            # index lookups and comparisons short-circuit on identity
+            for t in self.tasks:
+                t["status"] = sys.intern(t["status"])
+                t["group"] = sys.intern(t["group"])
+                t["priority"] = sys.intern(t.get("priority", "normal"))
+            self.rebuild_indexes()
+            self.bump_tasks_version(order_kept=False)
+            self.mark_menus_dirty()
+            self.schedule_render()
+        except Exception as e:
+            logging.error(f"Load Error: {e}")
+            messagebox.showwarning("Load Error", str(e))
+            self.tasks = []
+            self.rebuild_indexes()
+            # A journal may have been partly replayed before the error
+            self.journal_entries = 0
+            self.journal_bytes = 0
+            self.load_failed = True
+
+    def validate_json_data(self, data):
+        if not isinstance(data, list):
+            raise ValueError("Task file does not contain a list of tasks.")
+        # A subset test against the dict's key view runs in C, one call per item
+        required = REQUIRED_TASK_KEYS
+        for item in data:
+            if not (isinstance(item, dict) and required <= item.keys()):
+                raise ValueError("Malformed task entry in JSON.")
 
 if __name__ == "__main__":
     root = tk.Tk()
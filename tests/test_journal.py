@@ -0,0 +1,103 @@
+import json
+import os
+import sys
+import tkinter as tk
+
+import pytest
+
+pytest.importorskip("tkcalendar")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import task_ticker  # noqa: E402
+
+
+def make_task(task_id, name, status="pending"):
+    return {"id": task_id, "task": name, "status": status, "group": "General",
+            "due_date": "2025-05-01", "created_at": "2025-01-01T00:00:00",
+            "priority": "normal", "sequence": 1, "depends_on": None}
+
+
+def journal_line(entry):
+    return json.dumps(entry).encode("utf-8") + b"\n"
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(task_ticker.messagebox, "showwarning", lambda *a, **kw: None)
+    return tmp_path
+
+
+def open_app():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("no display")
+    root.withdraw()
+    app = task_ticker.TaskTickerApp(root)
+    root.update()
+    return app
+
+
+def task_names(app):
+    return sorted(t["task"] for t in app.tasks)
+
+
+def test_journal_is_replayed_over_snapshot(workdir):
+    with open(task_ticker.TASKS_FILE, "w") as f:
+        json.dump([make_task("a", "alpha"), make_task("b", "beta")], f)
+    with open(task_ticker.JOURNAL_FILE, "wb") as f:
+        f.write(journal_line({"op": "put", "task": make_task("c", "gamma")}))
+        f.write(journal_line({"op": "put", "task": make_task("b", "beta", "done")}))
+        f.write(journal_line({"op": "del", "id": "a"}))
+    app = open_app()
+    assert task_names(app) == ["beta", "gamma"]
+    assert app.tasks_by_id["b"]["status"] == "done"
+    app.on_close()
+    with open(task_ticker.TASKS_FILE) as f:
+        assert sorted(t["task"] for t in json.load(f)) == ["beta", "gamma"]
+    assert not os.path.exists(task_ticker.JOURNAL_FILE)
+
+
+def test_torn_last_line_is_cut_off(workdir):
+    good = journal_line({"op": "put", "task": make_task("a", "alpha")})
+    with open(task_ticker.JOURNAL_FILE, "wb") as f:
+        f.write(good + b'{"op": "put", "ta')
+    app = open_app()
+    assert task_names(app) == ["alpha"]
+    # The next append must start on its own line
+    with open(task_ticker.JOURNAL_FILE, "rb") as f:
+        assert f.read() == good
+    assert app.journal_bytes == len(good)
+    app.on_close()
+
+
+def test_unterminated_last_line_is_kept(workdir):
+    good = journal_line({"op": "put", "task": make_task("a", "alpha")})
+    with open(task_ticker.JOURNAL_FILE, "wb") as f:
+        f.write(good + good.replace(b'"a"', b'"b"').rstrip(b"\n"))
+    app = open_app()
+    assert task_names(app) == ["alpha", "alpha"]
+    with open(task_ticker.JOURNAL_FILE, "rb") as f:
+        assert f.read().endswith(b"}\n")
+    app.on_close()
+
+
+def test_failed_load_leaves_files_alone(workdir):
+    with open(task_ticker.TASKS_FILE, "w") as f:
+        json.dump([make_task(str(i), f"task {i}") for i in range(3)], f)
+    bad = make_task("x", "broken")
+    del bad["status"]
+    with open(task_ticker.JOURNAL_FILE, "wb") as f:
+        f.write(journal_line({"op": "put", "task": make_task("y", "fine")}))
+        f.write(journal_line({"op": "put", "task": bad}))
+    with open(task_ticker.TASKS_FILE, "rb") as f:
+        snapshot = f.read()
+    with open(task_ticker.JOURNAL_FILE, "rb") as f:
+        journal = f.read()
+    app = open_app()
+    assert app.tasks == []
+    app.on_close()
+    with open(task_ticker.TASKS_FILE, "rb") as f:
+        assert f.read() == snapshot
+    with open(task_ticker.JOURNAL_FILE, "rb") as f:
+        assert f.read() == journal